@@ -20,6 +20,8 @@ import functools
 import importlib
 import json
 import pathlib
+import textwrap
+import typing
 from collections.abc import Sequence
 
 from inmanta_module_factory.builder import InmantaModuleBuilder
@@ -57,8 +59,10 @@ from inmanta.ast.type import (
 from inmanta.module import Module, ModuleV2, ModuleV2Source
 from inmanta_plugins.git_ops import slice
 
-# Cache entities to support recursive schema generation
-ENTITIES: dict[Sequence[str], Entity] = {}
+# Cache entities to support recursive schema generation.  The entities are
+# cached per module builder, an entity generated for a builder must never
+# be reused in another one (i.e. after the builder cache has been cleared).
+ENTITIES: dict[tuple[InmantaModuleBuilder, tuple[str, ...]], Entity] = {}
 
 
 # Define some configuration options for the generator
@@ -112,6 +116,18 @@ def get_module_builder(module: str) -> InmantaModuleBuilder:
     return InmantaModuleBuilder.from_existing_module(get_module(module))
 
 
+@functools.lru_cache(maxsize=4096)
+def entity_name(name: str) -> str:
+    """
+    Convert the given name into a conventional entity name.  The same
+    relation names come back for every entity with multiple parents, the
+    conversion is cached.
+
+    :param name: The name to convert.
+    """
+    return utils.inmanta_entity_name(name)
+
+
 def long_description(
     description: str | None, *, max_len: int = 90, indent: str = ""
 ) -> str | None:
@@ -132,42 +148,73 @@ def long_description(
     if len(description) < max_len:
         return description
 
-    words = description.split(" ")
-    formatted_description: list[str] = [""]
-    for word in words:
-        if len(formatted_description[-1]) + len(word) > max_len:
-            formatted_description.append(indent + word)
-        elif formatted_description[-1]:
-            formatted_description[-1] += " " + word
-        else:
-            formatted_description[-1] += word
+    return "\n".join(
+        textwrap.wrap(
+            description,
+            width=max_len,
+            subsequent_indent=indent,
+            break_long_words=False,
+            break_on_hyphens=False,
+        )
+    )
+
+
+# The untyped list type, shared by all the list attributes
+InmantaUntypedListType = InmantaAdvancedType("list")
+
+
+@functools.lru_cache
+def get_list_type(item_type: InmantaType) -> InmantaListType:
+    """
+    Get the list type whose items have the given type.  The list types are
+    shared by all the attributes with the same item type.
+
+    :param item_type: The type of the items of the list.
+    """
+    return InmantaListType(item_type)
+
 
-    return "\n".join(formatted_description)
+# Map each type of the inmanta dsl to a function converting it into its
+# generator equivalent.
+ATTRIBUTE_TYPES: dict[type[Type], typing.Callable[[typing.Any], InmantaType]] = {
+    String: lambda _: InmantaStringType,
+    Integer: lambda _: InmantaIntegerType,
+    Float: lambda _: InmantaFloatType,
+    Bool: lambda _: InmantaBooleanType,
+    Dict: lambda _: InmantaDictType,
+    TypedList: lambda t: get_list_type(get_attribute_type(t.element_type)[0]),
+    List: lambda _: InmantaUntypedListType,
+}
 
 
-def get_attribute_type(inmanta_type: Type) -> InmantaType:
+def get_attribute_type(inmanta_type: Type) -> tuple[InmantaType, bool]:
     """
     Map a type of the inmanta dsl to the corresponding generator equivalent.
+    The conversion is looked up along the mro of the type, so that the most
+    specific conversion is used (i.e. TypedList before List).
+
+    Returns the converted type and whether the input type is nullable, the
+    nullable wrapper itself doesn't have any generator equivalent, it is
+    expressed as an optional attribute instead.
     """
-    match inmanta_type:
-        case String():
-            return InmantaStringType
-        case Integer():
-            return InmantaIntegerType
-        case Float():
-            return InmantaFloatType
-        case Bool():
-            return InmantaBooleanType
-        case Dict():
-            return InmantaDictType
-        case TypedList():
-            return InmantaListType(get_attribute_type(inmanta_type.element_type))
-        case List():
-            return InmantaAdvancedType("list")
-        case NullableType():
-            return get_attribute_type(inmanta_type.element_type)
-        case _:
-            raise ValueError(f"Unsupported attribute type: {inmanta_type}")
+    nullable = False
+    while isinstance(inmanta_type, NullableType):
+        # Nested optionals (e.g. an optional alias of an optional type) are
+        # all expressed by the same optional attribute
+        nullable = True
+        inmanta_type = inmanta_type.element_type
+
+    # Most attributes use one of the types of the table directly (mostly
+    # String), only walk the mro for subclasses
+    convert = ATTRIBUTE_TYPES.get(type(inmanta_type))
+    if convert is not None:
+        return convert(inmanta_type), nullable
+
+    for type_class in type(inmanta_type).__mro__:
+        if type_class in ATTRIBUTE_TYPES:
+            return ATTRIBUTE_TYPES[type_class](inmanta_type), nullable
+
+    raise ValueError(f"Unsupported attribute type: {inmanta_type}")
 
 
 def get_attribute(
@@ -185,10 +232,11 @@ def get_attribute(
     :param default: When set, the DSL literal to use as the default value of
         the attribute.
     """
+    inmanta_type, optional = get_attribute_type(schema.inmanta_type)
     return Attribute(
         name=schema.name,
-        inmanta_type=get_attribute_type(schema.inmanta_type),
-        optional=isinstance(schema.inmanta_type, NullableType),
+        inmanta_type=inmanta_type,
+        optional=optional,
         default=default,
         description=long_description(schema.description, max_len=70, indent=" " * 4),
         entity=entity,
@@ -215,17 +263,24 @@ def get_key_fields(
     :param parent_relation: When set, the parent relation to prepend to the
         index fields.
     """
-    fields_by_name = {field.name: field for field in entity.all_fields()}
-
-    key_fields: dict[str, EntityField] = {}
+    # Only index the fields that are part of the keys
+    wanted = frozenset(keys)
+    fields_by_name = {
+        field.name: field for field in entity.all_fields() if field.name in wanted
+    }
+
+    key_fields: list[EntityField] = []
+    seen: set[str] = set()
     if parent_relation is not None:
-        key_fields[parent_relation.name] = parent_relation
+        key_fields.append(parent_relation)
+        seen.add(parent_relation.name)
 
     for key in keys:
-        if key in fields_by_name:
-            key_fields[key] = fields_by_name[key]
+        if key in fields_by_name and key not in seen:
+            key_fields.append(fields_by_name[key])
+            seen.add(key)
 
-    return list(key_fields.values())
+    return key_fields
 
 
 def get_relation(
@@ -251,7 +306,7 @@ def get_relation(
             if EXPLICIT_PARENT_RELATIONS
             else "parent"
         ),
-        path=schema.entity.path,
+        path=list(schema.entity.path),
         cardinality=(1, 1),
         description="Relation to parent",
     )
@@ -318,7 +373,7 @@ def get_relation(
             parent_relation=None,
         )
         embedded_entity = Entity(
-            name=parent.name + utils.inmanta_entity_name(schema.name),
+            name=parent.name + entity_name(schema.name),
             path=parent.path,
             parents=[base],
             description=(
@@ -394,11 +449,11 @@ def get_entity(
     :param builder: The inmanta module builder in which the entity should
         be added.
     """
-    entity_path = tuple(schema.path + [schema.name])
-    if entity_path in ENTITIES:
-        return ENTITIES[entity_path]
-
+    entity_path = (*schema.path, schema.name)
     builder = get_module_builder(entity_path[0])
+    cache_key = (builder, entity_path)
+    if cache_key in ENTITIES:
+        return ENTITIES[cache_key]
 
     # When this entity is a member of a discriminated union with many parent
     # contexts, the union base is moved from this entity's extends list to the
@@ -414,7 +469,7 @@ def get_entity(
     # Emit the entity
     entity = Entity(
         name=schema.name,
-        path=schema.path,
+        path=list(schema.path),
         parents=[
             get_entity(schema=parent)
             for parent in schema.base_entities
@@ -425,7 +480,7 @@ def get_entity(
         force_attribute_doc=False,
         sort_attributes=False,
     )
-    ENTITIES[entity_path] = entity
+    ENTITIES[cache_key] = entity
     builder.add_module_element(entity)
 
     # Go over all the attributes and relations
@@ -26,9 +26,10 @@ from dataclasses import asdict, dataclass
 from inmanta.plugins import Context, Plugin, plugin
 from inmanta.util import dict_path
 from inmanta_git_ops import const
+from inmanta_plugins.git_ops import slice
 
 
-@dataclass(frozen=True, kw_only=True)
+@dataclass(frozen=True, kw_only=True, slots=True)
 class Slice:
     name: str
     store_name: str
@@ -37,6 +38,20 @@ class Slice:
     deleted: bool = False
 
 
+@functools.lru_cache(maxsize=2048)
+def compiled_path(path: str) -> dict_path.DictPath:
+    """
+    Parse the given dict path expression.  The same path expressions are
+    used over and over during a compile (once per slice and per processed
+    attribute), the parsed paths are cached to avoid parsing them every
+    time.  DictPath objects are never modified once parsed, so they can
+    safely be shared.
+
+    :param path: The dict path expression to parse.
+    """
+    return dict_path.to_path(path)
+
+
 @plugin
 def unroll_slices(
     store_name: str,
@@ -93,8 +108,6 @@ def attributes(
     slice_object_cls = getattr(slice_object_module, class_name)
 
     # Make sure the class is a valid slice
-    from inmanta_plugins.git_ops import slice
-
     if not issubclass(slice_object_cls, slice.EmbeddedSliceObjectABC):
         raise ValueError(
             f"Class {slice_object_type} (from {slice_object_type}) is not a valid Slice definition."
@@ -131,7 +144,7 @@ def get_slice_previous_attribute(
 
     return store.get_store(store_name).get_slice_previous_attribute(
         name,
-        dict_path.to_path(path),
+        compiled_path(path),
         default=default,
     )
 
@@ -153,9 +166,7 @@ def get_slice_attribute(
     """
     from inmanta_plugins.git_ops import store
 
-    return store.get_store(store_name).get_slice_attribute(
-        name, dict_path.to_path(path)
-    )
+    return store.get_store(store_name).get_slice_attribute(name, compiled_path(path))
 
 
 @plugin
@@ -178,7 +189,7 @@ def update_slice_attribute(
     from inmanta_plugins.git_ops import store
 
     return store.get_store(store_name).set_slice_attribute(
-        name, dict_path.to_path(path), value
+        name, compiled_path(path), value
     )
 
 
@@ -341,7 +352,7 @@ def attribute_processor[
             return previous_value
 
         # Get the embedded (or root) slice carrying the processed value
-        value_path = dict_path.to_path(path)
+        value_path = compiled_path(path)
         parent_path = get_parent_path(value_path)
         parent = get_slice_attribute(store_name, name, str(parent_path))
         if parent["operation"] == const.SLICE_DELETE:
@@ -24,7 +24,7 @@ import inmanta_plugins.config
 
 from inmanta.plugins import Context, ModelType, plugin
 from inmanta.util import dict_path
-from inmanta_plugins.git_ops import Slice, attribute_processor, store
+from inmanta_plugins.git_ops import Slice, attribute_processor, compiled_path, store
 
 
 @plugin
@@ -55,9 +55,7 @@ def used_values(
     """
     path = dict_path.to_wild_path(wild_path)
 
-    matching_paths = {
-        path: dict_path.to_path(path) for path, _ in slice_matching.items()
-    }
+    matching_paths = {path: compiled_path(path) for path, _ in slice_matching.items()}
 
     # Filter out the slices which don't match the filter
     def match_filter(s: Slice) -> bool:
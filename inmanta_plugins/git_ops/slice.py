@@ -16,12 +16,13 @@ limitations under the License.
 Contact: edvgui@gmail.com
 """
 
-import contextlib
+import functools
 import inspect
 import itertools
 import logging
 import sys
 import textwrap
+import types
 import typing
 from collections.abc import Generator, Mapping, Sequence
 from contextlib import contextmanager
@@ -74,16 +75,39 @@ def exclude_model_values() -> Generator[None, None, None]:
     SLICE_UPDATE.reset(token)
 
 
+# The origins of the generic python types that translate to inmanta
+# dicts and lists
+MAPPING_ORIGINS: frozenset[object] = frozenset({Mapping, dict, typing.Mapping})
+SEQUENCE_ORIGINS: frozenset[object] = frozenset({Sequence, list, typing.Sequence})
+
+# Map the basic python types to their inmanta equivalent
+PRIMITIVE_TYPES: dict[object, inmanta_type.Type] = {
+    list: inmanta_type.List(),
+    dict: inmanta_type.Dict(),
+    str: inmanta_type.String(),
+    bool: inmanta_type.Bool(),
+    float: inmanta_type.Float(),
+    int: inmanta_type.Integer(),
+}
+
+
+@functools.lru_cache(maxsize=None)
 def get_optional_type(python_type: type[object]) -> type[object]:
     """
     If the input type is a union of type A and None, return type A.
-    Otherwise raise a ValueError.
+    Otherwise raise a ValueError.  The result is cached, the same
+    annotations come back for every slice class.
 
     :param python_type: The type which we expect to be an optional.
     """
     if not typing_inspect.is_union_type(python_type):
         raise ValueError(f"Type {python_type} is not optional (union)")
 
+    # Most common case, a union of exactly one type and None
+    match typing.get_args(python_type):
+        case (other, types.NoneType) | (types.NoneType, other):
+            return other
+
     if not typing_inspect.is_optional_type(python_type):
         raise ValueError(f"Type {python_type} is not optional (nullable)")
 
@@ -101,14 +125,21 @@ def get_optional_type(python_type: type[object]) -> type[object]:
     raise ValueError(f"Type {python_type} is not a supported optional")
 
 
+@functools.lru_cache(maxsize=None)
 def to_inmanta_type(python_type: type[object]) -> inmanta_type.Type:
     """
     Try to convert a python type annotation to an Inmanta DSL type annotation.
     Only the conversion to inmanta primitive types is supported.
-    If the conversion is not possible, raise a ValueError.
+    If the conversion is not possible, raise a ValueError.  The result is
+    cached, the same annotations come back for every slice class and the
+    inmanta types are never modified once created.
 
     :param python_type: The python type annotation.
     """
+    # Basic types, they are the most common annotations, check them first
+    if python_type in PRIMITIVE_TYPES:
+        return PRIMITIVE_TYPES[python_type]
+
     # Resolve aliases
     if isinstance(python_type, typing.TypeAliasType):
         return to_inmanta_type(python_type.__value__)
@@ -135,42 +166,80 @@ def to_inmanta_type(python_type: type[object]) -> inmanta_type.Type:
     # Lists and dicts
     if typing_inspect.is_generic_type(python_type):
         origin = typing.get_origin(python_type)
-        if origin in [Mapping, dict, typing.Mapping]:
-            return inmanta_type.Dict()
-        elif origin in [Sequence, list, typing.Sequence]:
+        if origin in MAPPING_ORIGINS:
+            return PRIMITIVE_TYPES[dict]
+        elif origin in SEQUENCE_ORIGINS:
             args = typing.get_args(python_type)
             if not args:
-                return inmanta_type.List()
+                return PRIMITIVE_TYPES[list]
             return inmanta_type.TypedList(to_inmanta_type(args[0]))
         else:
             raise ValueError(f"Can not handle type {python_type} (generic)")
 
-    # Basic types
-    if python_type is list:
-        return inmanta_type.List()
+    raise ValueError(f"Can not handle type {python_type}")
 
-    if python_type is dict:
-        return inmanta_type.Dict()
 
-    if python_type is str:
-        return inmanta_type.String()
+@functools.lru_cache(maxsize=None)
+def try_optional_type(python_type: type[object]) -> type[object] | None:
+    """
+    Same as get_optional_type, but return None when the input type is not
+    an optional.  Unsupported types are cached too, so that the exception
+    is only raised once per annotation.
 
-    if python_type is bool:
-        return inmanta_type.Bool()
+    :param python_type: The type which we expect to be an optional.
+    """
+    try:
+        return get_optional_type(python_type)
+    except ValueError:
+        return None
 
-    if python_type is float:
-        return inmanta_type.Float()
 
-    if python_type is int:
-        return inmanta_type.Integer()
+@functools.lru_cache(maxsize=None)
+def try_inmanta_type(python_type: type[object]) -> inmanta_type.Type | None:
+    """
+    Same as to_inmanta_type, but return None when the conversion is not
+    possible.  Unsupported types (i.e. relations) are cached too, so that
+    the exception is only raised once per annotation.
 
-    raise ValueError(f"Can not handle type {python_type}")
+    :param python_type: The python type annotation.
+    """
+    try:
+        return to_inmanta_type(python_type)
+    except ValueError:
+        return None
 
 
 # Cache for the synthetic entity schemas representing discriminated unions.
 # Keyed by (module name, union name) to support recursive type definitions.
 _UNION_SCHEMA_CACHE: dict[tuple[str, str], "SliceEntitySchema"] = {}
 
+# Cache for the entity schemas of the slice classes.  Keyed by the class
+# itself, to support recursive type definitions.
+_ENTITY_SCHEMA_CACHE: dict[type, "SliceEntitySchema"] = {}
+
+
+@functools.lru_cache(maxsize=None)
+def module_path(module: str) -> tuple[str, ...]:
+    """
+    Get the path of the entities defined in the given python module of an
+    inmanta module, i.e. the name of the python module without the
+    inmanta_plugins namespace.
+
+    :param module: The name of the python module.
+    """
+    return tuple(module.split(".")[1:])
+
+
+def is_slice_class(value: object) -> typing.TypeGuard[type["EmbeddedSliceObjectABC"]]:
+    """
+    Check whether the given value is a slice class, i.e. a subclass of
+    EmbeddedSliceObjectABC.  Most of the values checked are annotations which
+    are not classes at all, those are discarded with a plain isinstance check.
+
+    :param value: The value to check, usually an annotation.
+    """
+    return isinstance(value, type) and issubclass(value, EmbeddedSliceObjectABC)
+
 
 def resolve_forward_reference(
     annotation: object, owner_cls: type
@@ -262,9 +331,7 @@ def discriminated_union(
 
     union_type = typing.get_args(resolved)[0]
     members = [
-        member
-        for member in typing.get_args(union_type)
-        if inspect.isclass(member) and issubclass(member, EmbeddedSliceObjectABC)
+        member for member in typing.get_args(union_type) if is_slice_class(member)
     ]
     if not members:
         return None
@@ -290,7 +357,7 @@ def union_schema(
     :param owner_cls: The class defining the relation towards the union, used
         to locate the module in which the union entity lives.
     """
-    path = owner_cls.__module__.split(".")[1:]
+    path = module_path(owner_cls.__module__)
     key = (owner_cls.__module__, name)
     if key in _UNION_SCHEMA_CACHE:
         return _UNION_SCHEMA_CACHE[key]
@@ -301,20 +368,20 @@ def union_schema(
 
     schema = SliceEntitySchema(
         name=name,
-        keys=members[0].keys,
+        keys=tuple(members[0].keys),
         path=path,
-        base_entities=[],
+        base_entities=(),
         sub_entities=[],
         description=f"Base entity for the members of the {name} discriminated union.",
         parent_entities=[],
-        embedded_entities=[],
-        attributes=[
+        embedded_entities=(),
+        attributes=(
             SliceEntityAttributeSchema(
                 name=discriminator,
                 description=discriminator_field.description,
                 inmanta_type=to_inmanta_type(type(discriminator_field.default)),
-            )
-        ],
+            ),
+        ),
         discriminator=discriminator,
     )
     _UNION_SCHEMA_CACHE[key] = schema
@@ -323,7 +390,7 @@ def union_schema(
         member_schema = member.entity_schema()
         member_schema.discriminator_value = member.model_fields[discriminator].default
         if schema not in member_schema.base_entities:
-            member_schema.base_entities = [*member_schema.base_entities, schema]
+            member_schema.base_entities = (*member_schema.base_entities, schema)
         for attr in member_schema.attributes:
             if attr.name == discriminator:
                 attr.is_discriminator = True
@@ -352,13 +419,13 @@ def relation_target_schema(
         return union_schema(*union, owner_cls)
 
     resolved, _ = resolve_forward_reference(element, owner_cls)
-    if inspect.isclass(resolved) and issubclass(resolved, EmbeddedSliceObjectABC):
+    if is_slice_class(resolved):
         return resolved.entity_schema()
 
     return None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SliceEntityRelationSchema:
     """
     Schema of a relation connection a slice entity to another
@@ -382,7 +449,7 @@ class SliceEntityRelationSchema:
     cardinality_max: int | None = None
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SliceEntityParentSchema:
     """
     Schema of a parent of an embedded slice.  The parent is another
@@ -397,7 +464,7 @@ class SliceEntityParentSchema:
     entity: "SliceEntitySchema"
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SliceEntityAttributeSchema:
     """
     Schema of an attribute of a slice entity.  The difference
@@ -422,7 +489,7 @@ class SliceEntityAttributeSchema:
     is_discriminator: bool = False
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True)
 class SliceEntitySchema:
     """
     Schema of an slice entity, with all its attributes and relations.
@@ -490,18 +557,20 @@ class SliceEntitySchema:
         instances sharing the same keys but belonging to different concrete
         sub entities do not collide.
         """
+        if self.discriminator_value is None:
+            return tuple([(k, str(instance[k])) for k in self.keys])
+
         identity: list[tuple[str, object]] = []
-        if self.discriminator_value is not None:
-            discriminator = next(
-                (
-                    base.discriminator
-                    for base in self.base_entities
-                    if base.discriminator is not None
-                ),
-                None,
-            )
-            if discriminator is not None:
-                identity.append((discriminator, str(instance[discriminator])))
+        discriminator = next(
+            (
+                base.discriminator
+                for base in self.base_entities
+                if base.discriminator is not None
+            ),
+            None,
+        )
+        if discriminator is not None:
+            identity.append((discriminator, str(instance[discriminator])))
         identity.extend((k, str(instance[k])) for k in self.keys)
         return tuple(identity)
 
@@ -514,12 +583,12 @@ class SliceEntitySchema:
         attributes_by_name: dict[str, SliceEntityAttributeSchema] = dict()
 
         for base_entity in reversed(self.base_entities):
-            attributes_by_name.update(
-                {attr.name: attr for attr in base_entity.all_attributes()}
-            )
+            for attr in base_entity.all_attributes():
+                attributes_by_name[attr.name] = attr
 
-        attributes_by_name.update({attr.name: attr for attr in self.attributes})
-        return list(attributes_by_name.values())
+        for attr in self.attributes:
+            attributes_by_name[attr.name] = attr
+        return tuple(attributes_by_name.values())
 
     def all_relations(self) -> Sequence[SliceEntityRelationSchema]:
         """
@@ -530,12 +599,12 @@ class SliceEntitySchema:
         relations_by_name: dict[str, SliceEntityRelationSchema] = dict()
 
         for base_entity in reversed(self.base_entities):
-            relations_by_name.update(
-                {attr.name: attr for attr in base_entity.all_relations()}
-            )
+            for attr in base_entity.all_relations():
+                relations_by_name[attr.name] = attr
 
-        relations_by_name.update({attr.name: attr for attr in self.embedded_entities})
-        return list(relations_by_name.values())
+        for attr in self.embedded_entities:
+            relations_by_name[attr.name] = attr
+        return tuple(relations_by_name.values())
 
     def all_parents(self) -> typing.Iterator[SliceEntityParentSchema]:
         """
@@ -682,9 +751,7 @@ class EmbeddedSliceObjectABC(pydantic.BaseModel):
                 continue
 
             annotation = info.annotation
-            if inspect.isclass(annotation) and issubclass(
-                annotation, EmbeddedSliceObjectABC
-            ):
+            if is_slice_class(annotation):
                 # Mandatory relation towards an embedded slice object, always
                 # scaffold it recursively: even when the field has a default,
                 # the embedded object may have required properties of its own
@@ -719,10 +786,9 @@ class EmbeddedSliceObjectABC(pydantic.BaseModel):
         This schema can be used to generate the model definition matching
         the python class definition.
         """
-
-        cached_attribute = f"_{cls.__name__}__entity_schema__"
-        if hasattr(cls, cached_attribute):
-            return typing.cast(SliceEntitySchema, getattr(cls, cached_attribute))
+        cached = _ENTITY_SCHEMA_CACHE.get(cls)
+        if cached is not None:
+            return cached
 
         embedded_entities: list[SliceEntityRelationSchema] = []
         attributes: list[SliceEntityAttributeSchema] = []
@@ -737,14 +803,13 @@ class EmbeddedSliceObjectABC(pydantic.BaseModel):
         # cache before exploring any of the relations
         entity_schema = SliceEntitySchema(
             name=cls.__name__,
-            keys=cls.keys,
-            path=cls.__module__.split(".")[1:],
-            base_entities=[
+            keys=tuple(cls.keys),
+            path=module_path(cls.__module__),
+            base_entities=tuple(
                 base_class.entity_schema()
                 for base_class in cls.__bases__
-                if inspect.isclass(base_class)
-                and issubclass(base_class, EmbeddedSliceObjectABC)
-            ],
+                if is_slice_class(base_class)
+            ),
             sub_entities=list(),
             description=docstring(cls),
             parent_entities=list(),
@@ -752,42 +817,57 @@ class EmbeddedSliceObjectABC(pydantic.BaseModel):
             attributes=attributes,
         )
         # Save entity into the cache
-        setattr(cls, cached_attribute, entity_schema)
+        _ENTITY_SCHEMA_CACHE[cls] = entity_schema
 
         # Make sure that each parent entity knows about all its sub entities
         for base_entity in entity_schema.base_entities:
             base_entity.sub_entities.append(entity_schema)
 
-        for attribute, info in cls.model_fields.items():
-            python_type = info.annotation
-
-            if attribute not in cls.__annotations__:
-                # This attribute is defined on a parent class
-                continue
+        # Only the annotations defined on the class itself, without walking
+        # the mro, the attributes of the parents belong to their own schema.
+        # The fields are still visited in the order of model_fields, which
+        # keeps a redefined field at the position it has in the parent.
+        own_annotations = inspect.get_annotations(cls)
+        own_fields = (
+            [
+                (attribute, info)
+                for attribute, info in cls.model_fields.items()
+                if attribute in own_annotations
+            ]
+            if own_annotations
+            else []
+        )
 
+        for attribute, info in own_fields:
+            python_type = info.annotation
             if python_type is None:
                 # No annotation
                 raise ValueError(f"{cls}.{attribute} doesn't have any type annotation")
 
             # Primitive
-            with contextlib.suppress(ValueError):
-                # Try to resolve the corresponding inmanta primitive
-                # type.  If there is none, skip the attribute
+            # Try to resolve the corresponding inmanta primitive
+            # type.  If there is none, the attribute is a relation
+            primitive_type = try_inmanta_type(python_type)
+            if primitive_type is not None:
                 attributes.append(
                     SliceEntityAttributeSchema(
                         name=attribute,
                         description=info.description,
-                        inmanta_type=to_inmanta_type(python_type),
+                        inmanta_type=primitive_type,
                     ),
                 )
                 continue
 
+            # Resolve the origin and args of the annotation once, the cheap
+            # checks on them go first, before the typing_inspect predicates
+            origin = typing.get_origin(python_type)
+            args = typing.get_args(python_type)
+
             # Relation
             if (
-                typing_inspect.is_generic_type(python_type)
-                and (origin := typing.get_origin(python_type)) is not None
-                and origin in [Sequence, list, typing.Sequence]
-                and (args := typing.get_args(python_type)) is not None
+                origin in SEQUENCE_ORIGINS
+                and args
+                and typing_inspect.is_generic_type(python_type)
             ):
                 target = relation_target_schema(args[0], cls, fallback_name=attribute)
                 if target is not None:
@@ -803,8 +883,8 @@ class EmbeddedSliceObjectABC(pydantic.BaseModel):
                     continue
 
             # Optional relation
-            with contextlib.suppress(ValueError):
-                optional = get_optional_type(python_type)
+            optional = try_optional_type(python_type)
+            if optional is not None:
                 target = relation_target_schema(optional, cls, fallback_name=attribute)
                 if target is not None:
                     embedded_entities.append(
@@ -847,6 +927,10 @@ class EmbeddedSliceObjectABC(pydantic.BaseModel):
                 )
             )
 
+        # The schema is complete, freeze its own attributes and relations
+        entity_schema.attributes = tuple(attributes)
+        entity_schema.embedded_entities = tuple(embedded_entities)
+
         # Validate that the keys all match attributes
         attribute_names = [attr.name for attr in entity_schema.all_attributes()]
         missing = set(cls.keys) - set(attribute_names)
@@ -20,6 +20,7 @@ import collections
 import itertools
 import json
 import logging
+import os
 import pathlib
 import re
 import typing
@@ -38,10 +39,26 @@ from inmanta.util import dict_path
 from inmanta_git_ops import const
 from inmanta_plugins.git_ops import Slice, config, get_parent_path, slice
 
+try:
+    # Prefer the libyaml bindings, parsing and emitting yaml in C is much
+    # faster than the pure python implementation, fallback to it when
+    # libyaml is not available
+    from yaml import CSafeDumper as YamlSafeDumper
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeDumper as YamlSafeDumper  # type: ignore[assignment]
+    from yaml import SafeLoader as YamlSafeLoader  # type: ignore[assignment]
+
 # Dict registering all the slice stores when they are being created
 # This allows to find the store back, to access its slices.
 SLICE_STORE_REGISTRY: dict[str, "SliceStore[slice.SliceObjectABC]"] = {}
 
+# Name of the files containing a slice: the name of the slice, optionally
+# its version, and the file extension
+SLICE_FILE_NAME = re.compile(
+    r"(?P<name>[^@]+)(\@v(?P<version>\d+))?\.(?P<extension>[a-z]+)"
+)
+
 
 LOGGER = logging.getLogger(__name__)
 
@@ -60,7 +77,7 @@ def filter_path[T: object](slice: T) -> T:
             return slice
 
 
-@dataclass(frozen=True, kw_only=True)
+@dataclass(frozen=True, kw_only=True, slots=True)
 class SliceFile[S: slice.SliceObjectABC]:
     """
     Represent a file containing a slice definition.
@@ -78,12 +95,20 @@ class SliceFile[S: slice.SliceObjectABC]:
         validation.  This is useful for migrations, where the file on
         disk may predate the current schema.
         """
+        if self.extension not in ["json", "yaml", "yml"]:
+            raise ValueError(f"Unsupported slice file extension: {self.extension}")
+
+        raw = self.path.read_bytes()
+        if len(raw) <= 4 and raw.strip() == b"{}":
+            # Deleted slice, the file contains an empty mapping, no need
+            # to go through the parser
+            return {}
+
+        # Both parsers detect the unicode encoding of the raw bytes themselves
         if self.extension == "json":
-            attributes = json.loads(self.path.read_text())
-        elif self.extension in ["yaml", "yml"]:
-            attributes = yaml.safe_load(self.path.read_text())
+            attributes = json.loads(raw)
         else:
-            raise ValueError(f"Unsupported slice file extension: {self.extension}")
+            attributes = yaml.load(raw, Loader=YamlSafeLoader)
 
         if attributes is None:
             return {}
@@ -105,9 +130,7 @@ class SliceFile[S: slice.SliceObjectABC]:
 
         # Load default values (for model-only values too)
         return filter_path(
-            pydantic.TypeAdapter(self.schema)
-            .validate_python(attributes)
-            .model_dump(mode="json")
+            self.schema.model_validate(attributes).model_dump(mode="json")
         )
 
     def write_raw(self, attributes: dict) -> None:
@@ -115,25 +138,32 @@ class SliceFile[S: slice.SliceObjectABC]:
         Write the given raw attributes to the slice file, preserving the
         file's extension, without applying any schema validation.  This
         is useful for migrations, where the attributes may not yet
-        conform to the current schema.
+        conform to the current schema.  The file is left untouched when it
+        already has the exact same content.
         """
         if self.extension == "json":
             try:
-                return self.path.write_text(json.dumps(attributes, indent=2))
+                content = json.dumps(attributes, indent=2)
             except TypeError as e:
                 raise ValueError(
                     f"Attributes can not be serialized: {attributes}"
                 ) from e
-
-        if self.extension in ["yaml", "yml"]:
+        elif self.extension in ["yaml", "yml"]:
             try:
-                return self.path.write_text(yaml.safe_dump(attributes, sort_keys=False))
+                content = yaml.dump(attributes, Dumper=YamlSafeDumper, sort_keys=False)
             except yaml.error.YAMLError as e:
                 raise ValueError(
                     f"Attributes can not be serialized: {attributes}"
                 ) from e
+        else:
+            raise ValueError(f"Unsupported slice file extension: {self.extension}")
 
-        raise ValueError(f"Unsupported slice file extension: {self.extension}")
+        raw = content.encode()
+        if self.path.is_file() and self.path.read_bytes() == raw:
+            # Nothing changed, don't rewrite the file
+            return
+
+        self.path.write_bytes(raw)
 
     def write(self, attributes: dict) -> None:
         """
@@ -145,11 +175,7 @@ class SliceFile[S: slice.SliceObjectABC]:
         """
         with slice.exclude_model_values():
             attributes = (
-                (
-                    pydantic.TypeAdapter(self.schema)
-                    .validate_python(attributes)
-                    .model_dump(mode="json")
-                )
+                self.schema.model_validate(attributes).model_dump(mode="json")
                 if attributes != {}
                 else {}
             )
@@ -180,6 +206,8 @@ class SliceFile[S: slice.SliceObjectABC]:
         self,
         store_name: str,
         default_version: int | None = None,
+        *,
+        attributes: dict | None = None,
     ) -> Slice:
         """
         Construct the slice containing in this file.  If the slice file is not
@@ -189,6 +217,8 @@ class SliceFile[S: slice.SliceObjectABC]:
         :param store_name: The name of the store this slice belongs into.
         :param default_version: If the slice is a source slice, the version that
             should be assigned to it.
+        :param attributes: The content of the file, if it has already been read.
+            When not provided, the file is read.
         """
         version = self.version
         if version is None:
@@ -201,7 +231,8 @@ class SliceFile[S: slice.SliceObjectABC]:
             )
 
         # Read the slice content
-        attributes = self.read()
+        if attributes is None:
+            attributes = self.read()
 
         return Slice(
             name=self.name,
@@ -224,10 +255,7 @@ class SliceFile[S: slice.SliceObjectABC]:
 
         :param file: The path to a file whose name we want to parse.
         """
-        matched = re.fullmatch(
-            r"(?P<name>[^@]+)(\@v(?P<version>\d+))?\.(?P<extension>[a-z]+)",
-            str(file.name),
-        )
+        matched = SLICE_FILE_NAME.fullmatch(file.name)
         if not matched:
             raise ValueError(f"Can not parse slice filename at {file}")
 
@@ -287,12 +315,14 @@ class SliceStore[S: slice.SliceObjectABC]:
         self._active_path: pathlib.Path | None = None
         self.active_slice_files: dict[str, list[SliceFile]] | None = None
         self.active_slices: dict[str, list[Slice]] | None = None
+        self.latest_slices: dict[str, Slice] | None = None
 
         # This dict contains all the resolved slices to be used in the
         # current compile
         self.current_slices: dict[str, Slice] | None = None
         self.previous_slices: dict[str, Slice] | None = None
         self.slices: dict[str, Slice] | None = None
+        self.sorted_slices: Sequence[Slice] | None = None
 
         # This is the path to the file keeping track of the applied migrations for this store
         self._migration_state_path: pathlib.Path | None = None
@@ -420,39 +450,61 @@ class SliceStore[S: slice.SliceObjectABC]:
             # Empty compile, we shouldn't load any slice
             return self.active_slice_files
 
-        for file in self.active_path.glob("*"):
-            if not file.is_file():
-                # Not a file, ignore it
-                continue
+        # Scan the folder, the entries carry their type from the directory
+        # listing, checking them doesn't require any additional stat call
+        with os.scandir(self.active_path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    # Hidden file, ignore it
+                    continue
 
-            if file.name.startswith("."):
-                # Hidden file, ignore it
-                continue
+                if not entry.is_file():
+                    # Not a file, ignore it
+                    continue
 
-            slice_file = SliceFile.from_path(file, self.schema)
-            self.active_slice_files[slice_file.name].append(slice_file)
+                slice_file = SliceFile.from_path(
+                    self.active_path / entry.name, self.schema
+                )
+                self.active_slice_files[slice_file.name].append(slice_file)
 
         return self.active_slice_files
 
     def load_active_slices(self) -> dict[str, list[Slice]]:
         """
-        Load all the active slices.
+        Load all the active slices.  The versions of each slice are sorted
+        from the most recent to the oldest.
         """
         if self.active_slices is not None:
             return self.active_slices
 
         self.active_slices = {
-            slice: [slice_file.emit_slice(self.name) for slice_file in slice_files]
+            slice: sorted(
+                (slice_file.emit_slice(self.name) for slice_file in slice_files),
+                key=lambda s: s.version,
+                reverse=True,
+            )
             for slice, slice_files in self.load_active_slice_files().items()
         }
         return self.active_slices
 
+    def load_latest_slices(self) -> dict[str, Slice]:
+        """
+        Load the latest version of all the active slices.
+        """
+        if self.latest_slices is not None:
+            return self.latest_slices
+
+        self.latest_slices = {
+            name: slices[0] for name, slices in self.load_active_slices().items()
+        }
+        return self.latest_slices
+
     def get_latest_slice(self, name: str) -> Slice:
         """
         Get the latest version of the given active slice.
         """
-        active_slices = self.load_active_slices()
-        if name not in active_slices:
+        latest_slices = self.load_latest_slices()
+        if name not in latest_slices:
             return Slice(
                 name=name,
                 store_name=self.name,
@@ -461,12 +513,7 @@ class SliceStore[S: slice.SliceObjectABC]:
                 deleted=True,
             )
 
-        slices = sorted(
-            active_slices[name],
-            key=lambda s: s.version,
-            reverse=True,
-        )
-        return slices[0]
+        return latest_slices[name]
 
     def load_source_slice_files(self) -> dict[str, SliceFile]:
         """
@@ -484,17 +531,22 @@ class SliceStore[S: slice.SliceObjectABC]:
             # Empty compile, we shouldn't load any slice
             return self.source_slice_files
 
-        for file in self.source_path.glob("*"):
-            if not file.is_file():
-                # Not a file, ignore it
-                continue
+        # Scan the folder, the entries carry their type from the directory
+        # listing, checking them doesn't require any additional stat call
+        with os.scandir(self.source_path) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    # Hidden file, ignore it
+                    continue
 
-            if file.name.startswith("."):
-                # Hidden file, ignore it
-                continue
+                if not entry.is_file():
+                    # Not a file, ignore it
+                    continue
 
-            slice_file = SliceFile.from_path(file, self.schema)
-            self.source_slice_files[slice_file.name] = slice_file
+                slice_file = SliceFile.from_path(
+                    self.source_path / entry.name, self.schema
+                )
+                self.source_slice_files[slice_file.name] = slice_file
 
         return self.source_slice_files
 
@@ -532,6 +584,7 @@ class SliceStore[S: slice.SliceObjectABC]:
                 self.source_slices[name] = slice_file.emit_slice(
                     store_name=self.name,
                     default_version=latest.version + 1,
+                    attributes=attributes,
                 )
 
         # Deleted slices still need to be added to the source slices
@@ -565,22 +618,23 @@ class SliceStore[S: slice.SliceObjectABC]:
 
         # In these compile modes, the current version of the slices is read
         # from the source folder, like for an update compile
-        source_view = const.COMPILE_MODE in [
+        source_view = const.COMPILE_MODE in (
             const.COMPILE_UPDATE,
             const.COMPILE_SYNC,
             const.COMPILE_SLICE_LIST,
             const.COMPILE_SLICE_INSPECT,
-        ]
+        )
 
         slices = set(active_slices.keys())
         if source_view:
             # We need to look at the source of the slices too
-            slices |= self.load_source_slices().keys()
+            source_slices = self.load_source_slices()
+            slices |= source_slices.keys()
 
         self.current_slices: dict[str, Slice] = {}
         for s in slices:
             if source_view:
-                self.current_slices[s] = self.load_source_slices()[s]
+                self.current_slices[s] = source_slices[s]
             else:
                 self.current_slices[s] = self.get_latest_slice(s)
 
@@ -595,47 +649,40 @@ class SliceStore[S: slice.SliceObjectABC]:
             return self.previous_slices
 
         active_slices = self.load_active_slices()
+        entity_schema = self.schema.entity_schema()
 
         self.previous_slices: dict[str, Slice] = {}
         for s, current in self.load_current_slices().items():
             latest = self.get_latest_slice(s)
 
-            previous = [
-                s.attributes
-                for s in sorted(
-                    active_slices.get(s, []),
-                    key=lambda s: s.version,
-                    reverse=True,
-                )
-            ]
+            previous = [p.attributes for p in active_slices.get(s, [])]
             if current == latest:
                 previous = previous[1:]
 
-            while len(previous) >= 2:
-                p_current = previous[0]
-                p_previous = previous[1]
-                previous = [
-                    merge_attributes(
-                        p_current,
-                        p_previous,
-                        path=dict_path.NullPath(),
-                        schema=self.schema.entity_schema(),
-                        # Don't insert the path yet to avoid trigerring a diff when there
-                        # is not one
-                        insert_path=False,
-                    ),
-                    *previous[2:],
-                ]
-
-            if previous:
-                self.previous_slices[s] = Slice(
-                    name=s,
-                    store_name=self.name,
-                    version=current.version - 1,
-                    attributes=previous[0],
-                    deleted=False,
+            if not previous:
+                continue
+
+            # Fold all the previous versions, from the most recent to the oldest
+            merged = previous[0]
+            for p_previous in previous[1:]:
+                merged = merge_attributes(
+                    merged,
+                    p_previous,
+                    path=dict_path.NullPath(),
+                    schema=entity_schema,
+                    # Don't insert the path yet to avoid trigerring a diff when there
+                    # is not one
+                    insert_path=False,
                 )
 
+            self.previous_slices[s] = Slice(
+                name=s,
+                store_name=self.name,
+                version=current.version - 1,
+                attributes=merged,
+                deleted=False,
+            )
+
         return self.previous_slices
 
     def load_slices(self) -> dict[str, Slice]:
@@ -662,6 +709,7 @@ class SliceStore[S: slice.SliceObjectABC]:
         self.migrate()
 
         previous_slices = self.load_previous_slices()
+        entity_schema = self.schema.entity_schema()
 
         self.slices: dict[str, Slice] = {}
         for s, current in self.load_current_slices().items():
@@ -677,7 +725,7 @@ class SliceStore[S: slice.SliceObjectABC]:
                     current=None,
                     previous=previous_slices[s].attributes,
                     path=dict_path.NullPath(),
-                    schema=self.schema.entity_schema(),
+                    schema=entity_schema,
                 )
             else:
                 # Normal merge
@@ -686,7 +734,7 @@ class SliceStore[S: slice.SliceObjectABC]:
                     current=current.attributes,
                     previous=None if new else previous_slices[s].attributes,
                     path=dict_path.NullPath(),
-                    schema=self.schema.entity_schema(),
+                    schema=entity_schema,
                 )
 
             # Merge the current and previous slices together
@@ -717,9 +765,7 @@ class SliceStore[S: slice.SliceObjectABC]:
                 self.migration_state_path,
             )
             raw = json.loads(self.migration_state_path.read_text())
-            return (
-                pydantic.TypeAdapter(SliceStoreMigrations).validate_python(raw).applied
-            )
+            return SliceStoreMigrations.model_validate(raw).applied
         except (json.JSONDecodeError, pydantic.ValidationError) as e:
             LOGGER.error(
                 "Invalid migration state file at %s: %s", self.migration_state_path, e
@@ -847,7 +893,19 @@ class SliceStore[S: slice.SliceObjectABC]:
                 f"Sync blocked: some slices still contained some change: {changed_slices}"
             )
 
+        # The versions of the slices which are already active, their file
+        # doesn't need to be written again
+        active_versions = {
+            (name, slice_file.version)
+            for name, slice_files in self.load_active_slice_files().items()
+            for slice_file in slice_files
+        }
+
         for slice in self.source_slices.values():
+            if (slice.name, slice.version) in active_versions:
+                # This version of the slice is already active
+                continue
+
             # The slice can be activated, create the file, then save the slice content
             # into it
             slice_file = SliceFile(
@@ -942,15 +1000,23 @@ class SliceStore[S: slice.SliceObjectABC]:
         self.source_slices = None
         self.active_slice_files = None
         self.active_slices = None
+        self.latest_slices = None
         self.current_slices = None
         self.previous_slices = None
         self.slices = None
+        self.sorted_slices = None
 
-    def get_all_slices(self) -> list[Slice]:
+    def get_all_slices(self) -> Sequence[Slice]:
         """
         Get all the slices, this method is similar to load, but more explicit.
+        The slices are sorted by name, the sorted sequence is cached until the
+        store is cleared.
         """
-        return sorted(self.load_slices().values(), key=lambda s: s.name)
+        if self.sorted_slices is None:
+            self.sorted_slices = tuple(
+                sorted(self.load_slices().values(), key=lambda s: s.name)
+            )
+        return self.sorted_slices
 
     def get_one_slice(self, name: str) -> Slice:
         """
@@ -1090,12 +1156,12 @@ def get_store(store_name: str) -> SliceStore[slice.SliceObjectABC]:
     Get the store with the given name, raise a LookupError if it
     doesn't exist.
     """
-    if store_name not in SLICE_STORE_REGISTRY:
+    try:
+        return SLICE_STORE_REGISTRY[store_name]
+    except KeyError:
         raise LookupError(
             f"Cannot find any store named {store_name}.  Available stores are {SLICE_STORE_REGISTRY.keys()}"
-        )
-
-    return SLICE_STORE_REGISTRY[store_name]
+        ) from None
 
 
 def write_command_output(result: object) -> None:
@@ -1270,51 +1336,27 @@ def merge_attributes(
     schema = schema.resolve(current if current else typing.cast(dict, previous))
 
     # Go over all attributes, the merged value will always be the value
-    # from the current
+    # from the current, or from the previous if there is no current (they
+    # can not both be None, this case returned above)
+    source = current if current is not None else previous
+    assert source is not None
+
     for attribute in schema.all_attributes():
-        if attribute.name in ["operation", "path"]:
+        if attribute.name in ("operation", "path"):
             continue
-        match current, previous:
-            case None, dict():
-                merged[attribute.name] = previous.get(attribute.name)
-            case dict(), _:
-                merged[attribute.name] = current.get(attribute.name)
-            case _:
-                raise ValueError(
-                    f"Current and previous can not both be None!  But it is the case for path {path}"
-                )
+        merged[attribute.name] = source.get(attribute.name)
 
     # Go over all relations
     for relation in schema.all_relations():
         if relation.cardinality_max == 1:
-            # Direct relation
-            match current, previous:
-                case None, dict():
-                    merged[relation.name] = merge_attributes(
-                        current=None,
-                        previous=previous.get(relation.name),
-                        path=path + dict_path.InDict(relation.name),
-                        schema=relation.entity,
-                        insert_path=insert_path,
-                    )
-                case dict(), None:
-                    merged[relation.name] = merge_attributes(
-                        current=current.get(relation.name),
-                        previous=None,
-                        path=path + dict_path.InDict(relation.name),
-                        schema=relation.entity,
-                        insert_path=insert_path,
-                    )
-                case dict(), dict():
-                    merged[relation.name] = merge_attributes(
-                        current=current.get(relation.name),
-                        previous=previous.get(relation.name),
-                        path=path + dict_path.InDict(relation.name),
-                        schema=relation.entity,
-                        insert_path=insert_path,
-                    )
-                case _:
-                    merged[relation.name] = None
+            # Direct relation, at least one of current and previous is a dict
+            merged[relation.name] = merge_attributes(
+                current=current.get(relation.name) if current is not None else None,
+                previous=previous.get(relation.name) if previous is not None else None,
+                path=path + dict_path.InDict(relation.name),
+                schema=relation.entity,
+                insert_path=insert_path,
+            )
         else:
             # Relation, attribute should be a list, and should be merged.  For a
             # discriminated union, resolve each item to its concrete sub entity so
@@ -16,10 +16,14 @@ limitations under the License.
 Contact: edvgui@gmail.com
 """
 
-from inmanta_module_factory.inmanta import Index
+from inmanta_module_factory.inmanta import Index, InmantaStringType
 from inmanta_plugins.example.slices.fs import RootFolder
 
+from inmanta.ast.type import NullableType, String
 from inmanta_git_ops import generator
+from inmanta_plugins.git_ops import slice
+
+type MaybeStr = str | None
 
 
 def test_index_field_order_matches_keys() -> None:
@@ -48,3 +52,52 @@ def test_index_field_order_matches_keys() -> None:
     assert len(indexes) == 1
 
     assert [field.name for field in indexes[0].fields] == list(schema.keys)
+
+
+def test_nested_nullable_attribute_type() -> None:
+    """
+    An optional field whose type is itself an optional alias results in a
+    nullable type wrapping another nullable type.  All the levels must be
+    unwrapped into a single optional attribute.
+    """
+    nested = slice.to_inmanta_type(MaybeStr | None)
+    assert nested == NullableType(NullableType(String()))
+
+    assert generator.get_attribute_type(nested) == (InmantaStringType, True)
+    assert generator.get_attribute_type(NullableType(String())) == (
+        InmantaStringType,
+        True,
+    )
+    assert generator.get_attribute_type(String()) == (InmantaStringType, False)
+
+
+def test_long_description() -> None:
+    """
+    Long descriptions are wrapped on word boundaries, without trailing
+    whitespace, and with the given indentation on the continuation lines.
+    Descriptions which are short enough, or already contain newlines, are
+    kept as is.
+    """
+    assert generator.long_description(None) is None
+    assert generator.long_description("Short description") == "Short description"
+
+    description = " ".join(["word"] * 30)
+    wrapped = generator.long_description(description, max_len=40, indent="    ")
+    assert wrapped is not None
+    lines = wrapped.split("\n")
+    assert len(lines) > 1
+    assert all(len(line) <= 40 for line in lines)
+    assert all(line == line.rstrip() for line in lines)
+    assert not lines[0].startswith(" ")
+    assert all(line.startswith("    word") for line in lines[1:])
+    assert " ".join(line.strip() for line in lines) == description
+
+    # Words longer than the line are not broken
+    long_word = "a" * 50
+    assert generator.long_description(f"{long_word} {long_word}", max_len=40) == (
+        f"{long_word}\n{long_word}"
+    )
+
+    # Descriptions with newlines are already formatted by their author
+    formatted = "First line\n" + " ".join(["word"] * 30)
+    assert generator.long_description(formatted, max_len=40) == formatted
@@ -24,6 +24,7 @@ from inmanta_plugins.example.slices.fs import File, Folder, RootFolder
 from inmanta_plugins.example.slices.recursive import EmbeddedSlice, Slice
 from inmanta_plugins.example.slices.simple import Slice as SimpleSlice
 
+import inmanta.ast.type as inmanta_type
 from inmanta_git_ops import const
 from inmanta_plugins.git_ops import slice
 
@@ -235,3 +236,60 @@ def test_scaffold_discriminated_union() -> None:
         # the placeholder
         "broken": const.SLICE_PLACEHOLDER,
     }
+
+
+def test_merged_attributes_follow_schema_changes() -> None:
+    """
+    The merged attributes and relations of a schema must reflect any new
+    collection assigned to the schema or to any of its base entities.
+    """
+
+    def attribute(name: str) -> slice.SliceEntityAttributeSchema:
+        return slice.SliceEntityAttributeSchema(
+            name=name, description=None, inmanta_type=inmanta_type.String()
+        )
+
+    def entity(
+        name: str, *base_entities: slice.SliceEntitySchema
+    ) -> slice.SliceEntitySchema:
+        return slice.SliceEntitySchema(
+            name=name,
+            keys=(),
+            path=("test",),
+            base_entities=base_entities,
+            sub_entities=[],
+            description=None,
+            parent_entities=[],
+            embedded_entities=(),
+            attributes=(attribute(f"{name.lower()}_attr"),),
+        )
+
+    base = entity("Base")
+    child = entity("Child", base)
+    assert [a.name for a in child.all_attributes()] == ["base_attr", "child_attr"]
+
+    # Change the attributes of the base entity
+    base.attributes = (*base.attributes, attribute("extra"))
+    assert [a.name for a in child.all_attributes()] == [
+        "base_attr",
+        "extra",
+        "child_attr",
+    ]
+
+    # Add a base entity to the child
+    other = entity("Other")
+    child.base_entities = (*child.base_entities, other)
+    assert [a.name for a in child.all_attributes()] == [
+        "other_attr",
+        "base_attr",
+        "extra",
+        "child_attr",
+    ]
+
+    # Change the relations of the base entity
+    assert child.all_relations() == ()
+    relation = slice.SliceEntityRelationSchema(
+        name="rel", description=None, entity=other
+    )
+    base.embedded_entities = (relation,)
+    assert child.all_relations() == (relation,)
@@ -0,0 +1,59 @@
+"""
+Copyright 2026 Guillaume Everarts de Velp
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Contact: edvgui@gmail.com
+"""
+
+import pathlib
+
+import pytest
+from inmanta_plugins.example.slices.recursive import Slice
+
+from inmanta_plugins.git_ops.store import SliceFile
+
+
+@pytest.mark.parametrize("extension", ["json", "yaml", "yml"])
+@pytest.mark.parametrize("content", [b"{}", b"{}\n", b"{}\r\n", b" {} "])
+def test_read_deleted_slice(
+    tmp_path: pathlib.Path, extension: str, content: bytes
+) -> None:
+    """
+    Deleted slices are stored as a file containing an empty mapping, with
+    or without a trailing newline.  Reading them results in an empty dict,
+    and the emitted slice is marked as deleted.
+    """
+    path = tmp_path / f"a@v2.{extension}"
+    path.write_bytes(content)
+
+    slice_file = SliceFile.from_path(path, Slice)
+    assert slice_file.read_raw() == {}
+    assert slice_file.read() == {}
+
+    emitted = slice_file.emit_slice("test")
+    assert emitted.deleted
+    assert emitted.version == 2
+    assert emitted.attributes == {}
+
+
+@pytest.mark.parametrize("extension", ["json", "yaml"])
+def test_read_small_slice(tmp_path: pathlib.Path, extension: str) -> None:
+    """
+    Small files which are not an empty mapping still go through the parser.
+    """
+    path = tmp_path / f"a@v1.{extension}"
+    path.write_bytes(b"[]")
+
+    with pytest.raises(ValueError, match="does not contain a json mapping"):
+        SliceFile.from_path(path, Slice).read_raw()
@@ -18,6 +18,7 @@ Contact: edvgui@gmail.com
 
 import copy
 import json
+import os
 import pathlib
 
 import pytest
@@ -1138,3 +1139,126 @@ def test_delete_embedded_entities(project: Project, tmp_path: pathlib.Path) -> N
             ],
         }
     ]
+
+
+def test_sync_leaves_active_versions_untouched(
+    project: Project, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    A sync only writes the slice versions that are not active yet, the files
+    of the versions which are already active are not written again.
+    """
+    store = SliceStore(
+        name="test_sync",
+        folder="file://" + str(tmp_path / "test"),
+        schema=Slice,
+    )
+
+    model = """
+        import git_ops
+        import unittest
+
+        for slice in git_ops::unroll_slices("test_sync"):
+            unittest::Resource(
+                name=slice["name"],
+                desired_value=std::json_dumps(slice["attributes"]),
+            )
+        end
+    """
+
+    def sync() -> None:
+        with monkeypatch.context() as ctx:
+            ctx.setattr(const, "COMPILE_MODE", const.COMPILE_SYNC)
+            project.compile(model, no_dedent=False)
+
+    # The empty store creates the source folder
+    sync()
+
+    # Activate a first slice
+    (store.source_path / "a.json").write_text(
+        json.dumps({"name": "a", "embedded_required": _embedded("aa")})
+    )
+    sync()
+    a_v1 = store.active_path / "a@v1.json"
+    assert a_v1.exists()
+
+    # Store the active file in a different (compact) format than the one
+    # used by the store, and move its modification time in the past, any
+    # write would change both
+    a_v1.write_text(json.dumps(json.loads(a_v1.read_text())))
+    content = a_v1.read_bytes()
+    os.utime(a_v1, ns=(0, 0))
+
+    # Add a second slice, and sync again, only the new slice is written
+    (store.source_path / "b.json").write_text(
+        json.dumps({"name": "b", "embedded_required": _embedded("bb")})
+    )
+    sync()
+    assert (store.active_path / "b@v1.json").exists()
+    assert a_v1.stat().st_mtime_ns == 0
+    assert a_v1.read_bytes() == content
+    assert not (store.active_path / "a@v2.json").exists()
+
+    # The untouched active version is still loaded correctly
+    project.compile(model, no_dedent=False)
+    for name in ["a", "b"]:
+        resource = project.get_resource("unittest::Resource", name=name)
+        assert resource is not None
+        attributes = json.loads(resource.desired_value)
+        assert attributes["version"] == 1
+        assert attributes["operation"] == "create"
+        assert attributes["embedded_required"]["name"] == name * 2
+
+
+def test_update_leaves_unchanged_sources_untouched(
+    project: Project, tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    An update compile writes the source slices back to file, but only the
+    files whose content differs from what would be written are modified.
+    """
+    store = SliceStore(
+        name="test_update",
+        folder="file://" + str(tmp_path / "test"),
+        schema=Slice,
+    )
+
+    model = """
+        import git_ops
+
+        for slice in git_ops::unroll_slices("test_update"):
+        end
+    """
+
+    def update() -> None:
+        with monkeypatch.context() as ctx:
+            ctx.setattr(const, "COMPILE_MODE", const.COMPILE_UPDATE)
+            project.compile(model, no_dedent=False)
+
+    # The empty store creates the source folder
+    update()
+
+    # A first update compile formats the source files the way the store
+    # writes them
+    a = store.source_path / "a.json"
+    b = store.source_path / "b.json"
+    a.write_text(json.dumps({"name": "a", "embedded_required": _embedded("aa")}))
+    b.write_text(json.dumps({"name": "b", "embedded_required": _embedded("bb")}))
+    update()
+
+    # Store b in a different (compact) format, and move the modification
+    # time of both files in the past, any write would change it
+    b.write_text(json.dumps(json.loads(b.read_text())))
+    a_content = a.read_bytes()
+    os.utime(a, ns=(0, 0))
+    os.utime(b, ns=(0, 0))
+
+    update()
+
+    # a was already up to date, it is left untouched
+    assert a.stat().st_mtime_ns == 0
+    assert a.read_bytes() == a_content
+
+    # b has been written again, in the format of the store
+    assert b.stat().st_mtime_ns != 0
+    assert b.read_text() == json.dumps(json.loads(b.read_text()), indent=2)